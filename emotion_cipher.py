@@ -4,12 +4,19 @@ while preserving their emotional signature for AI detection.
 """
 
 import json
+import asyncio
 import base64
 import hashlib
 import string
 import os
+import threading
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Optional
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.backends import default_backend
@@ -21,35 +28,215 @@ try:
 except ImportError:
     print("Warning: python-dotenv not found. Install it to use .env file: pip install python-dotenv")
 
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
+
+def _has_module(name: str) -> bool:
+    """Check whether a module is installed without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Heavy AI libraries are only imported by the detection backend that uses them
+HAS_GEMINI = _has_module("google.generativeai")
+if not HAS_GEMINI:
     print("Warning: google-generativeai library not found. Using basic emotion detection.")
 
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    import torch
-    HAS_TRANSFORMERS = True
-except ImportError:
-    HAS_TRANSFORMERS = False
+HAS_TRANSFORMERS = _has_module("transformers") and _has_module("torch")
+
+
+# Gemini prompt pieces, built once. The instructions are sent as the model's system
+# instruction; each request only carries the text(s) and the expected JSON schema.
+_GEMINI_SYSTEM_INSTRUCTION = """Analyze text and identify the PRIMARY emotions expressed, with confidence scores (0.0 to 1.0).
+
+Available emotions: Joy, Excitement, Sadness, Anger, Anxiety, Fear, Surprise, Love, Neutral
+
+Instructions:
+- Identify ONLY the top 2 most prominent emotions of each text
+- Use emotion names exactly as listed above (capitalized)
+- Confidence scores should be between 0.0 and 1.0"""
+
+_GEMINI_TEXT_PREFIX = "Text: "
+# Texts per batch request, so the JSON response stays well within the output token limit
+_GEMINI_BATCH_SIZE = 50
+_GEMINI_BATCH_PREFIX = (
+    "Analyze each of the following numbered texts separately. "
+    "Return exactly one result per text, using its number as \"index\".\n\nTexts:\n"
+)
+
+_GEMINI_EMOTION_LIST_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "emotion": {"type": "STRING"},
+            "confidence": {"type": "NUMBER"},
+        },
+        "required": ["emotion", "confidence"],
+    },
+}
+
+# Structured JSON output, so responses parse without stripping markdown
+_GEMINI_EMOTIONS_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {"emotions": _GEMINI_EMOTION_LIST_SCHEMA},
+        "required": ["emotions"],
+    },
+}
+
+_GEMINI_BATCH_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {
+            "results": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "index": {"type": "INTEGER"},
+                        "emotions": _GEMINI_EMOTION_LIST_SCHEMA,
+                    },
+                    "required": ["index", "emotions"],
+                },
+            },
+        },
+        "required": ["results"],
+    },
+}
+
+
+# Key derivation parameters
+KDF_SALT = b'emotion_crypt_salt'  # Legacy fixed salt, only for payloads without 'kdf_salt'
+KDF_SALT_SIZE = 16
+KDF_ITERATIONS = 100000
+
+
+def _derive_key(password: str, salt: bytes, iterations: int) -> bytes:
+    """Derive a Fernet key from a password using PBKDF2-HMAC-SHA256."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+        backend=default_backend()
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
+@lru_cache(maxsize=128)
+def _derive_key_cached(password: str, salt: bytes, iterations: int) -> bytes:
+    """
+    Memoized _derive_key(), keyed by the (password, salt) pair.
+    
+    Results are kept in process memory only (never written to disk). This pays off
+    for a configured per-tenant salt shared by many instances, and for decrypting
+    payloads made with another instance's salt; an instance's own random salt is
+    never seen again, so its derivation is not cached.
+    """
+    return _derive_key(password, salt, iterations)
+
+
+# Emotion name normalization for model outputs
+_EMOTION_MAP = MappingProxyType({
+    'joy': 'Joy',
+    'happiness': 'Joy',
+    'happy': 'Joy',
+    'excitement': 'Excitement',
+    'excited': 'Excitement',
+    'sadness': 'Sadness',
+    'sad': 'Sadness',
+    'anger': 'Anger',
+    'angry': 'Anger',
+    'anxiety': 'Anxiety',
+    'anxious': 'Anxiety',
+    'fear': 'Fear',
+    'afraid': 'Fear',
+    'surprise': 'Surprise',
+    'surprised': 'Surprise',
+    'love': 'Love',
+    'neutral': 'Neutral'
+})
+
+# Keyword tables for the basic (fallback) emotion detection
+# Emotion keywords with weights
+_EMOTION_KEYWORDS = MappingProxyType({
+    'joy': ('happy', 'joyful', 'delighted', 'pleased', 'overjoyed', 'glad', 'cheerful', 'ecstatic'),
+    'excitement': ('excited', 'thrilled', 'enthusiastic', 'eager', 'pumped', 'excitement'),  # Excitement as distinct emotion
+    'sadness': ('sad', 'unhappy', 'depressed', 'melancholy', 'down', 'disappointed', 'upset', 'gloomy'),
+    'anger': ('angry', 'mad', 'furious', 'irritated', 'annoyed', 'rage', 'frustrated', 'upset'),
+    'anxiety': ('anxious', 'anxiety', 'apprehensive'),  # Anxiety as distinct emotion
+    'fear': ('worried', 'afraid', 'scared', 'nervous', 'fearful', 'concerned'),  # General fear
+    'surprise': ('surprised', 'amazed', 'shocked', 'astonished', 'stunned'),
+    'love': ('love', 'adore', 'cherish', 'fond', 'affection'),
+    'neutral': ()
+})
+
+# Words that trigger both joy and excitement
+_DUAL_EMOTION_KEYWORDS = MappingProxyType({
+    'thrilled': ('joy', 'excitement'),
+    'ecstatic': ('joy', 'excitement'),
+    'overjoyed': ('joy', 'excitement'),
+})
+
+# Phrases for excitement
+_EXCITEMENT_PHRASES = ("can't wait", "cannot wait", "can not wait", "looking forward")
+
+# Positive outcomes that indicate joy when paired with one of the subjects
+_POSITIVE_OUTCOMES = ('got', 'received', 'achieved', 'succeeded', 'won', 'offer', 'success')
+_OUTCOME_SUBJECTS = ('job', 'promotion', 'acceptance', 'approval')
+
+# Every distinct keyword, so each one is searched for once per text
+_ALL_KEYWORDS = frozenset().union(
+    *_EMOTION_KEYWORDS.values(),
+    _DUAL_EMOTION_KEYWORDS, _EXCITEMENT_PHRASES, _POSITIVE_OUTCOMES, _OUTCOME_SUBJECTS
+)
+
+
+def _find_keywords(text_lower: str) -> set:
+    """Return every keyword that occurs in the text, testing each distinct keyword once."""
+    return {keyword for keyword in _ALL_KEYWORDS if keyword in text_lower}
+
+
+# Preferred order among basic-detection results with equal confidence
+_TIE_BREAK_PRIORITY = MappingProxyType({'Joy': 0, 'Excitement': 1})
+
+# Preferred display order of primary emotions: Joy before Excitement
+_EMOTION_PRIORITY = MappingProxyType({'Joy': 0, 'Excitement': 1, 'Anxiety': 2, 'Fear': 3,
+                                      'Anger': 4, 'Sadness': 5, 'Surprise': 6, 'Love': 7})
+
+# Character set for short encrypted text (matching example style)
+# Mix of letters, numbers, and special characters
+_SHORT_TEXT_CHARS = (string.ascii_letters + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?").encode()
+_SHORT_TEXT_CHARS_LEN = len(_SHORT_TEXT_CHARS)
+
+# Translation table mapping each hash byte value to its short-text character
+_SHORT_TEXT_TABLE = bytes(_SHORT_TEXT_CHARS[value % _SHORT_TEXT_CHARS_LEN] for value in range(256))
 
 
 class EmotionDetector:
     """Detects emotions in text using Gemini API or NLP models."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_size: int = 1024):
         """
         Initialize the emotion detector.
         
         Args:
             api_key: Gemini API key. If None, tries to load from GEMINI_API_KEY environment variable.
                     If not found, will use fallback detection methods.
+            cache_size: Maximum number of texts whose detection results are kept in memory.
+                    Set to 0 to disable caching.
         """
         self.gemini_model = None
         self.emotion_model = None
         self.tokenizer = None
+        self.cache_size = cache_size
+        # LRU cache of detection results, keyed by a digest of the text
+        self._cache: "OrderedDict[bytes, List[Tuple[str, float]]]" = OrderedDict()
+        # Guards the cache, which is shared when detecting from several threads
+        self._cache_lock = threading.Lock()
         # Try to get API key from parameter, then environment variable
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
@@ -61,12 +248,16 @@ class EmotionDetector:
         # Try Gemini API first (only if API key is provided)
         if HAS_GEMINI and self.api_key:
             try:
+                import google.generativeai as genai
                 genai.configure(api_key=self.api_key)
                 # Try available model names (without 'models/' prefix)
                 model_names = ['gemini-2.5-flash', 'gemini-1.5-flash', 'gemini-1.5-pro', 'gemini-pro']
                 for model_name in model_names:
                     try:
-                        self.gemini_model = genai.GenerativeModel(model_name)
+                        self.gemini_model = genai.GenerativeModel(
+                            model_name,
+                            system_instruction=_GEMINI_SYSTEM_INSTRUCTION
+                        )
                         print(f"Loaded Gemini API ({model_name}) for emotion detection successfully.")
                         return
                     except Exception as e:
@@ -85,12 +276,9 @@ class EmotionDetector:
             try:
                 # Using a pre-trained emotion classification model
                 model_name = "j-hartmann/emotion-english-distilroberta-base"
-                self.emotion_model = pipeline(
-                    "text-classification",
-                    model=model_name,
-                    return_all_scores=True
-                )
+                self.emotion_model = self._load_pipeline(model_name)
                 print("Loaded emotion detection model successfully.")
+                self._compile_model()
             except Exception as e:
                 print(f"Could not load transformer model: {e}")
                 print("Falling back to basic keyword-based emotion detection.")
@@ -98,148 +286,280 @@ class EmotionDetector:
         else:
             self.emotion_model = None
     
+    def _load_pipeline(self, model_name: str):
+        """Load the classification pipeline on GPU in FP16 when CUDA is available, else on CPU."""
+        import torch
+        from transformers import pipeline
+        
+        if torch.cuda.is_available():
+            try:
+                return pipeline(
+                    "text-classification",
+                    model=model_name,
+                    device=0,
+                    torch_dtype=torch.float16,
+                    return_all_scores=True
+                )
+            except Exception as e:
+                print(f"Could not load transformer model on GPU, using CPU: {e}")
+        
+        # FP32 on CPU, using every available core for intra-op parallelism
+        torch.set_num_threads(os.cpu_count() or 1)
+        return pipeline(
+            "text-classification",
+            model=model_name,
+            device=-1,
+            torch_dtype=torch.float32,
+            return_all_scores=True
+        )
+    
+    def _compile_model(self):
+        """
+        Compile the transformer model with torch.compile and warm it up once.
+        
+        Only done on CUDA, where reduce-overhead mode can use CUDA graphs; on CPU the
+        compile would add tens of seconds to start-up for little gain.
+        """
+        import torch
+        
+        model = self.emotion_model.model
+        model.eval()
+        if not hasattr(torch, "compile") or self.emotion_model.device.type != "cuda":
+            return
+        try:
+            # dynamic=True avoids recompiling for every new input length
+            self.emotion_model.model = torch.compile(model, mode="reduce-overhead", dynamic=True)
+            # Compilation happens on the first call, so pay it here rather than on a user request
+            self.emotion_model("Warm-up text for emotion detection.")
+            print("Compiled emotion detection model with torch.compile.")
+        except Exception as e:
+            print(f"Could not compile transformer model: {e}")
+            self.emotion_model.model = model
+    
     def detect_emotions(self, text: str) -> List[Tuple[str, float]]:
         """
         Detect emotions in text using Gemini API or fallback methods.
+        Results are cached, so repeated texts skip the model call.
         Returns list of (emotion, confidence) tuples.
         """
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        emotions, cacheable = self._detect_emotions_uncached(text)
+        if cacheable:
+            self._cache_put(key, emotions)
+        return list(emotions)
+    
+    async def detect_emotions_async(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Asynchronous detect_emotions(): awaits Gemini without blocking the event loop.
+        Transformer and keyword fallbacks run in a worker thread.
+        Returns list of (emotion, confidence) tuples.
+        """
+        key = self._cache_key(text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if self.gemini_model:
+            try:
+                emotions = await self._detect_with_gemini_async(text)
+            except Exception as e:
+                print(f"Error in Gemini emotion detection: {e}")
+                print("Falling back to keyword-based detection.")
+                emotions = []
+            emotions, cacheable = self._model_or_fallback(text, emotions)
+        else:
+            emotions, cacheable = await asyncio.to_thread(self._detect_emotions_uncached, text)
+        
+        if cacheable:
+            self._cache_put(key, emotions)
+        return list(emotions)
+    
+    def detect_emotions_batch(self, texts: List[str]) -> List[List[Tuple[str, float]]]:
+        """
+        Detect emotions for many texts with batched model calls
+        (one Gemini request per group of up to 50 texts).
+        Duplicate and cached texts are not sent to the model again.
+        Returns one list of (emotion, confidence) tuples per input text, in order.
+        """
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            cached = self._cache_get(self._cache_key(text))
+            if cached is not None:
+                results[text] = cached
+            else:
+                pending.append(text)
+        
+        if pending:
+            for text, (emotions, cacheable) in zip(pending, self._detect_emotions_batch_uncached(pending)):
+                if cacheable:
+                    self._cache_put(self._cache_key(text), emotions)
+                results[text] = emotions
+        
+        return [list(results[text]) for text in texts]
+    
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Compact cache key so long texts are not held in memory."""
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+    
+    def _cache_get(self, key: bytes) -> Optional[List[Tuple[str, float]]]:
+        """Return a copy of a cached result, or None on a miss."""
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            self._cache.move_to_end(key)
+        return list(cached)
+    
+    def _cache_put(self, key: bytes, emotions: List[Tuple[str, float]]):
+        """Store a result, evicting the least recently used entry when full."""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = emotions
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _detect_emotions_uncached(self, text: str) -> Tuple[List[Tuple[str, float]], bool]:
+        """
+        Run emotion detection without consulting the cache.
+        Returns the emotions and whether they may be cached. Keyword results used because
+        a model call failed are not cacheable, so the model is asked again next time.
+        """
         # Try Gemini API first
         if self.gemini_model:
             try:
-                return self._detect_with_gemini(text)
+                emotions = self._detect_with_gemini(text)
             except Exception as e:
                 print(f"Error in Gemini emotion detection: {e}")
                 print("Falling back to keyword-based detection.")
-                return self._basic_emotion_detection(text)
+                emotions = []
+            return self._model_or_fallback(text, emotions)
         
         # Fallback to transformers
         if self.emotion_model:
             try:
-                results = self.emotion_model(text)[0]
-                # Sort by score and return top emotions
-                emotions = [(item['label'], item['score']) for item in results]
-                emotions.sort(key=lambda x: x[1], reverse=True)
-                return emotions
+                return self._pipeline_emotions(self.emotion_model(text)[0]), True
+            except Exception as e:
+                print(f"Error in emotion detection: {e}")
+                return self._basic_emotion_detection(text), False
+        else:
+            return self._basic_emotion_detection(text), True
+    
+    def _detect_emotions_batch_uncached(self, texts: List[str]) -> List[Tuple[List[Tuple[str, float]], bool]]:
+        """Run batch emotion detection without consulting the cache, as (emotions, cacheable) pairs."""
+        # Try Gemini API first, one request per group of texts
+        if self.gemini_model:
+            model_results = []
+            for start in range(0, len(texts), _GEMINI_BATCH_SIZE):
+                group = texts[start:start + _GEMINI_BATCH_SIZE]
+                try:
+                    model_results.extend(self._detect_with_gemini_batch(group))
+                except Exception as e:
+                    print(f"Error in Gemini batch emotion detection: {e}")
+                    print("Falling back to keyword-based detection.")
+                    model_results.extend([] for _ in group)
+            return [self._model_or_fallback(text, emotions) for text, emotions in zip(texts, model_results)]
+        
+        # Fallback to transformers (the pipeline batches list inputs itself)
+        if self.emotion_model:
+            try:
+                return [(self._pipeline_emotions(results), True) for results in self.emotion_model(texts)]
             except Exception as e:
                 print(f"Error in emotion detection: {e}")
-                return self._basic_emotion_detection(text)
+                return [(self._basic_emotion_detection(text), False) for text in texts]
         else:
-            return self._basic_emotion_detection(text)
+            return [(self._basic_emotion_detection(text), True) for text in texts]
+    
+    def _model_or_fallback(self, text: str, emotions: List[Tuple[str, float]]) -> Tuple[List[Tuple[str, float]], bool]:
+        """Keep model emotions as cacheable; without any, use uncached keyword detection."""
+        if emotions:
+            return emotions, True
+        return self._basic_emotion_detection(text), False
+    
+    @staticmethod
+    def _pipeline_emotions(results: List[Dict]) -> List[Tuple[str, float]]:
+        """Convert transformer pipeline scores to (emotion, confidence) tuples."""
+        # Sort by score and return top emotions
+        emotions = [(item['label'], item['score']) for item in results]
+        emotions.sort(key=lambda x: x[1], reverse=True)
+        return emotions
     
     def _detect_with_gemini(self, text: str) -> List[Tuple[str, float]]:
-        """Detect emotions using Gemini API."""
-        prompt = f"""Analyze the following text and identify the PRIMARY emotions expressed. 
-Focus on the top 2 most prominent emotions. Return a JSON object with emotions and their confidence scores (0.0 to 1.0).
-
-Available emotions: Joy, Excitement, Sadness, Anger, Anxiety, Fear, Surprise, Love, Neutral
-
-Text: "{text}"
-
-Return ONLY a JSON object in this exact format (no markdown, no explanations):
-{{
-  "emotions": [
-    {{"emotion": "Joy", "confidence": 0.85}},
-    {{"emotion": "Anxiety", "confidence": 0.65}}
-  ]
-}}
-
-Instructions:
-- Identify ONLY the top 2 most prominent emotions
-- Use emotion names exactly as listed above (capitalized)
-- Confidence scores should be between 0.0 and 1.0
-- Return ONLY the JSON object, no other text"""
-
-        try:
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # Extract JSON from response (handle markdown code blocks if present)
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            # Parse JSON response
-            import json
-            result = json.loads(response_text)
-            
-            # Extract emotions
-            emotions = []
-            if "emotions" in result:
-                for item in result["emotions"]:
-                    emotion_name = item.get("emotion", "")
-                    confidence = float(item.get("confidence", 0.5))
-                    # Normalize emotion names to match our system
-                    emotion_name = self._normalize_emotion_name(emotion_name)
-                    emotions.append((emotion_name, confidence))
-            
-            if emotions:
-                emotions.sort(key=lambda x: x[1], reverse=True)
-                return emotions
-            else:
-                return self._basic_emotion_detection(text)
-                
-        except Exception as e:
-            print(f"Error parsing Gemini response: {e}")
-            return self._basic_emotion_detection(text)
+        """Detect emotions using Gemini API. Raises on API or parsing errors."""
+        response = self.gemini_model.generate_content(
+            _GEMINI_TEXT_PREFIX + json.dumps(text, ensure_ascii=False),
+            generation_config=_GEMINI_EMOTIONS_CONFIG
+        )
+        return self._emotions_from_gemini_response(response)
+    
+    async def _detect_with_gemini_async(self, text: str) -> List[Tuple[str, float]]:
+        """Detect emotions using Gemini API without blocking the event loop. Raises on errors."""
+        response = await self.gemini_model.generate_content_async(
+            _GEMINI_TEXT_PREFIX + json.dumps(text, ensure_ascii=False),
+            generation_config=_GEMINI_EMOTIONS_CONFIG
+        )
+        return self._emotions_from_gemini_response(response)
+    
+    def _emotions_from_gemini_response(self, response) -> List[Tuple[str, float]]:
+        """Parse a single-text Gemini response; empty if it has no emotions."""
+        # Parse JSON response (JSON mode returns a bare object, no markdown)
+        result = json.loads(response.text)
+        
+        # Extract emotions
+        return self._parse_gemini_emotions(result.get("emotions", []))
+    
+    def _detect_with_gemini_batch(self, texts: List[str]) -> List[List[Tuple[str, float]]]:
+        """Detect emotions for several texts with one Gemini API request."""
+        numbered_texts = "\n".join(f"{index}. {json.dumps(text, ensure_ascii=False)}" for index, text in enumerate(texts))
+        response = self.gemini_model.generate_content(
+            _GEMINI_BATCH_PREFIX + numbered_texts,
+            generation_config=_GEMINI_BATCH_CONFIG
+        )
+        result = json.loads(response.text)
+        
+        by_index = {}
+        for item in result.get("results", []):
+            try:
+                by_index[int(item.get("index"))] = self._parse_gemini_emotions(item.get("emotions", []))
+            except (TypeError, ValueError):
+                continue
+        
+        # Texts the model skipped come back empty and fall back to keyword-based detection
+        return [by_index.get(index, []) for index in range(len(texts))]
+    
+    def _parse_gemini_emotions(self, items: List[Dict]) -> List[Tuple[str, float]]:
+        """Convert Gemini emotion items to sorted (emotion, confidence) tuples."""
+        emotions = []
+        for item in items:
+            emotion_name = item.get("emotion", "")
+            confidence = float(item.get("confidence", 0.5))
+            # Normalize emotion names to match our system
+            emotion_name = self._normalize_emotion_name(emotion_name)
+            emotions.append((emotion_name, confidence))
+        emotions.sort(key=lambda x: x[1], reverse=True)
+        return emotions
     
     def _normalize_emotion_name(self, emotion: str) -> str:
         """Normalize emotion names to match our system."""
-        emotion_lower = emotion.lower()
-        emotion_mapping = {
-            'joy': 'Joy',
-            'happiness': 'Joy',
-            'happy': 'Joy',
-            'excitement': 'Excitement',
-            'excited': 'Excitement',
-            'sadness': 'Sadness',
-            'sad': 'Sadness',
-            'anger': 'Anger',
-            'angry': 'Anger',
-            'anxiety': 'Anxiety',
-            'anxious': 'Anxiety',
-            'fear': 'Fear',
-            'afraid': 'Fear',
-            'surprise': 'Surprise',
-            'surprised': 'Surprise',
-            'love': 'Love',
-            'neutral': 'Neutral'
-        }
-        return emotion_mapping.get(emotion_lower, emotion.capitalize())
+        return _EMOTION_MAP.get(emotion.lower(), emotion.capitalize())
     
     def _basic_emotion_detection(self, text: str) -> List[Tuple[str, float]]:
         """Fallback basic emotion detection using keyword matching."""
-        text_lower = text.lower()
-        
-        # Emotion keywords with weights
-        emotion_keywords = {
-            'joy': ['happy', 'joyful', 'delighted', 'pleased', 'overjoyed', 'glad', 'cheerful', 'ecstatic'],
-            'excitement': ['excited', 'thrilled', 'enthusiastic', 'eager', 'pumped', 'excitement'],  # Excitement as distinct emotion
-            'sadness': ['sad', 'unhappy', 'depressed', 'melancholy', 'down', 'disappointed', 'upset', 'gloomy'],
-            'anger': ['angry', 'mad', 'furious', 'irritated', 'annoyed', 'rage', 'frustrated', 'upset'],
-            'anxiety': ['anxious', 'anxiety', 'apprehensive'],  # Anxiety as distinct emotion
-            'fear': ['worried', 'afraid', 'scared', 'nervous', 'fearful', 'concerned'],  # General fear
-            'surprise': ['surprised', 'amazed', 'shocked', 'astonished', 'stunned'],
-            'love': ['love', 'adore', 'cherish', 'fond', 'affection'],
-            'neutral': []
-        }
-        
-        # Words that trigger both joy and excitement
-        dual_emotion_keywords = {
-            'thrilled': ['joy', 'excitement'],
-            'ecstatic': ['joy', 'excitement'],
-            'overjoyed': ['joy', 'excitement'],
-        }
-        
-        # Phrases for excitement
-        excitement_phrases = ["can't wait", "cannot wait", "can not wait", "looking forward"]
+        # All keyword, phrase and outcome lookups below hit this set
+        found = _find_keywords(text.lower())
         
         detected_emotions = []
         emotion_scores = {}
         
         # Check for dual emotion keywords first
-        for keyword, emotions in dual_emotion_keywords.items():
-            if keyword in text_lower:
+        for keyword, emotions in _DUAL_EMOTION_KEYWORDS.items():
+            if keyword in found:
                 for emotion in emotions:
                     if emotion not in emotion_scores:
                         emotion_scores[emotion] = 0.4
@@ -247,8 +567,8 @@ Instructions:
                         emotion_scores[emotion] = min(emotion_scores[emotion] + 0.2, 0.95)
         
         # Check for excitement phrases
-        for phrase in excitement_phrases:
-            if phrase in text_lower:
+        for phrase in _EXCITEMENT_PHRASES:
+            if phrase in found:
                 if 'excitement' not in emotion_scores:
                     emotion_scores['excitement'] = 0.4
                 else:
@@ -258,20 +578,19 @@ Instructions:
                     emotion_scores['joy'] = 0.3
         
         # Check for positive outcomes that indicate joy
-        positive_outcomes = ['got', 'received', 'achieved', 'succeeded', 'won', 'offer', 'success']
-        outcome_matches = sum(1 for outcome in positive_outcomes if outcome in text_lower)
-        if outcome_matches > 0 and any(word in text_lower for word in ['job', 'promotion', 'acceptance', 'approval']):
+        outcome_matches = sum(1 for outcome in _POSITIVE_OUTCOMES if outcome in found)
+        if outcome_matches > 0 and any(word in found for word in _OUTCOME_SUBJECTS):
             if 'joy' not in emotion_scores:
                 emotion_scores['joy'] = 0.35
             else:
                 emotion_scores['joy'] = min(emotion_scores['joy'] + 0.15, 0.95)
         
         # Check standard emotion keywords
-        for emotion, keywords in emotion_keywords.items():
+        for emotion, keywords in _EMOTION_KEYWORDS.items():
             if emotion == 'neutral':
                 continue
             # Skip if already processed as dual emotion
-            matches = sum(1 for keyword in keywords if keyword in text_lower and keyword not in dual_emotion_keywords)
+            matches = sum(1 for keyword in keywords if keyword in found and keyword not in _DUAL_EMOTION_KEYWORDS)
             if matches > 0:
                 # Calculate confidence based on keyword matches
                 base_confidence = min(matches * 0.4, 0.95)
@@ -295,7 +614,7 @@ Instructions:
         # Sort by confidence, but prioritize certain emotion orders when scores are close
         detected_emotions.sort(key=lambda x: (
             -x[1],  # Primary sort: confidence (descending)
-            0 if x[0] == 'Joy' else 1 if x[0] == 'Excitement' else 2  # Secondary: preferred order
+            _TIE_BREAK_PRIORITY.get(x[0], 2)  # Secondary: preferred order
         ))
         return detected_emotions
     
@@ -304,17 +623,26 @@ Instructions:
         Get primary emotions above threshold.
         Returns list of emotion names.
         """
-        emotions = self.detect_emotions(text)
+        return self.get_primary_emotions_from(self.detect_emotions(text), threshold)
+    
+    def get_primary_emotions_from(self, emotions: List[Tuple[str, float]], threshold: float = 0.3) -> List[str]:
+        """
+        Get primary emotions above threshold from already detected emotions.
+        Returns list of emotion names.
+        """
         primary = [emotion for emotion, confidence in emotions if confidence >= threshold]
         
         # If no emotions above threshold, return top emotion
         if not primary and emotions:
             primary = [emotions[0][0]]
         
+        # Score of each emotion's first occurrence, built once instead of per comparison
+        score_map = {}
+        for emotion, confidence in emotions:
+            score_map.setdefault(emotion, confidence)
+        
         # Sort primary emotions with preferred order: Joy before Excitement
-        emotion_priority = {'Joy': 0, 'Excitement': 1, 'Anxiety': 2, 'Fear': 3, 
-                           'Anger': 4, 'Sadness': 5, 'Surprise': 6, 'Love': 7}
-        primary.sort(key=lambda x: (emotion_priority.get(x, 999), -emotions[[e[0] for e in emotions].index(x)][1] if x in [e[0] for e in emotions] else 0))
+        primary.sort(key=lambda x: (_EMOTION_PRIORITY.get(x, 999), -score_map.get(x, 0)))
         
         return primary
 
@@ -324,36 +652,33 @@ class EmotionCipher:
     Main class for encrypting text while preserving emotional signatures.
     """
     
-    def __init__(self, password: Optional[str] = None, api_key: Optional[str] = None):
+    def __init__(self, password: Optional[str] = None, api_key: Optional[str] = None,
+                 salt: Optional[bytes] = None):
         """
         Initialize the EmotionCipher.
         
         Args:
             password: Optional password for encryption. If None, generates a key.
             api_key: Optional Gemini API key. If None, uses default key.
+            salt: Optional key derivation salt, e.g. a fixed per-tenant salt from config.
+                  If None, a random salt is generated for this instance.
         """
         self.emotion_detector = EmotionDetector(api_key=api_key)
         self.password = password or self._generate_key()
-        self.cipher_suite = self._create_cipher_suite(self.password)
+        if salt:
+            self.salt = salt
+            self.key = _derive_key_cached(self.password, self.salt, KDF_ITERATIONS)
+        else:
+            self.salt = os.urandom(KDF_SALT_SIZE)
+            self.key = _derive_key(self.password, self.salt, KDF_ITERATIONS)
+        self.cipher_suite = self._create_cipher_suite(self.key)
     
     def _generate_key(self) -> str:
         """Generate a random encryption key."""
         return Fernet.generate_key().decode()
     
-    def _create_cipher_suite(self, password: str) -> Fernet:
-        """Create a Fernet cipher suite from password."""
-        # Convert password to bytes
-        password_bytes = password.encode()
-        
-        # Derive key using PBKDF2
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=b'emotion_crypt_salt',  # In production, use random salt
-            iterations=100000,
-            backend=default_backend()
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password_bytes))
+    def _create_cipher_suite(self, key: bytes) -> Fernet:
+        """Create a Fernet cipher suite from a derived key."""
         return Fernet(key)
     
     def _generate_short_encrypted_text(self, full_encrypted_text: str, length: int = 16) -> str:
@@ -370,23 +695,14 @@ class EmotionCipher:
             Short encrypted text string with special characters
         """
         # Create a hash from the encrypted text for deterministic generation
-        text_hash = hashlib.sha256(full_encrypted_text.encode()).hexdigest()
-        
-        # Character sets for short encrypted text (matching example style)
-        # Mix of letters, numbers, and special characters
-        chars = string.ascii_letters + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?"
+        hash_bytes = hashlib.sha256(full_encrypted_text.encode()).digest()
         
-        # Use hash to generate deterministic short string
-        short_text = []
-        hash_bytes = bytes.fromhex(text_hash)
+        # Repeat the digest if more characters are requested than it has bytes
+        if length > len(hash_bytes):
+            hash_bytes *= -(-length // len(hash_bytes))
         
-        for i in range(length):
-            # Use hash bytes to select characters deterministically
-            byte_value = hash_bytes[i % len(hash_bytes)]
-            char_index = byte_value % len(chars)
-            short_text.append(chars[char_index])
-        
-        return ''.join(short_text)
+        # Map every hash byte to its character in one C-level pass
+        return hash_bytes[:length].translate(_SHORT_TEXT_TABLE).decode()
     
     def encrypt(self, message: str) -> Dict:
         """
@@ -399,12 +715,85 @@ class EmotionCipher:
             Dictionary containing encrypted text and emotional signature
         """
         # Detect emotions BEFORE encryption
-        emotions = self.emotion_detector.get_primary_emotions(message)
         emotion_details = self.emotion_detector.detect_emotions(message)
+        return self._encrypt_with_emotions(message, emotion_details)
+    
+    def encrypt_batch(self, messages: List[str]) -> List[Dict]:
+        """
+        Encrypt many messages, detecting all their emotions in a single model call.
+        
+        Args:
+            messages: The text messages to encrypt
+            
+        Returns:
+            List of dictionaries as returned by encrypt(), in input order
+        """
+        emotion_details_list = self.emotion_detector.detect_emotions_batch(messages)
+        return [
+            self._encrypt_with_emotions(message, emotion_details)
+            for message, emotion_details in zip(messages, emotion_details_list)
+        ]
+    
+    async def encrypt_async(self, message: str) -> Dict:
+        """
+        Asynchronous encrypt(): awaits emotion detection, then encrypts locally.
+        
+        Args:
+            message: The text message to encrypt
+            
+        Returns:
+            Dictionary containing encrypted text and emotional signature
+        """
+        emotion_details = await self.emotion_detector.detect_emotions_async(message)
+        return self._encrypt_with_emotions(message, emotion_details)
+    
+    async def encrypt_many(self, messages: List[str], max_concurrency: int = 16) -> List[Dict]:
+        """
+        Encrypt many messages with concurrent emotion detection.
         
-        # Encrypt the text
-        encrypted_bytes = self.cipher_suite.encrypt(message.encode())
-        full_encrypted_text = base64.urlsafe_b64encode(encrypted_bytes).decode()
+        Args:
+            messages: The text messages to encrypt
+            max_concurrency: Maximum number of detections in flight, to respect API rate limits
+            
+        Returns:
+            List of dictionaries as returned by encrypt(), in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def encrypt_one(message: str) -> Dict:
+            async with semaphore:
+                return await self.encrypt_async(message)
+        
+        return list(await asyncio.gather(*(encrypt_one(message) for message in messages)))
+    
+    def encrypt_parallel(self, messages: List[str], max_workers: int = 8) -> List[Dict]:
+        """
+        Encrypt many messages, running emotion detection in a thread pool.
+        
+        Detection (Gemini HTTP calls or model inference) runs concurrently; the
+        encryption itself then runs serially, as it is fast C code. The Fernet
+        cipher suite holds no per-call state, so it is safe to share across threads.
+        
+        Args:
+            messages: The text messages to encrypt
+            max_workers: Maximum number of detection threads
+            
+        Returns:
+            List of dictionaries as returned by encrypt(), in input order
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            emotion_details_list = list(executor.map(self.emotion_detector.detect_emotions, messages))
+        return [
+            self._encrypt_with_emotions(message, emotion_details)
+            for message, emotion_details in zip(messages, emotion_details_list)
+        ]
+    
+    def _encrypt_with_emotions(self, message: str, emotion_details: List[Tuple[str, float]]) -> Dict:
+        """Encrypt a message and attach the signature for already detected emotions."""
+        emotions = self.emotion_detector.get_primary_emotions_from(emotion_details)
+        
+        # Encrypt the text (Fernet tokens are already URL-safe base64)
+        full_encrypted_text = self.cipher_suite.encrypt(message.encode()).decode()
         
         # Generate short encrypted text for display
         short_encrypted_text = self._generate_short_encrypted_text(full_encrypted_text, length=16)
@@ -421,28 +810,30 @@ class EmotionCipher:
             'encrypted_text': full_encrypted_text,  # Full encrypted text for decryption
             'short_encrypted_text': short_encrypted_text,  # Short version for display
             'emotional_signature': emotional_signature,
-            'encryption_method': 'AES-256-Fernet'
+            'encryption_method': 'AES-256-Fernet',
+            'kdf_salt': base64.urlsafe_b64encode(self.salt).decode()  # Needed to derive the key again
         }
     
     def _create_emotional_vector(self, emotion_details: List[Tuple[str, float]]) -> Dict[str, float]:
         """Create a normalized emotional feature vector."""
-        vector = {}
-        total_score = sum(score for _, score in emotion_details)
+        if len(emotion_details) == 1:
+            emotion, score = emotion_details[0]
+            return {emotion.lower(): 1.0} if score > 0 else {'neutral': 1.0}
         
-        if total_score > 0:
-            for emotion, score in emotion_details:
-                vector[emotion.lower()] = float(score / total_score)
-        else:
-            vector['neutral'] = 1.0
+        total_score = sum(score for _, score in emotion_details)
+        if total_score <= 0:
+            return {'neutral': 1.0}
         
-        return vector
+        return {emotion.lower(): score / total_score for emotion, score in emotion_details}
     
-    def decrypt(self, encrypted_data: Dict) -> Dict:
+    def decrypt(self, encrypted_data: Dict, verify: bool = False) -> Dict:
         """
         Decrypt a message and retrieve original text and emotion.
         
         Args:
             encrypted_data: Dictionary containing encrypted text and emotional signature
+            verify: If True, re-detect emotions from the decrypted text and return
+                    them as 'verified_emotion' (None otherwise)
             
         Returns:
             Dictionary containing decrypted message and detected emotion
@@ -453,8 +844,8 @@ class EmotionCipher:
         
         # Decrypt the text
         try:
-            encrypted_bytes = base64.urlsafe_b64decode(encrypted_text.encode())
-            decrypted_bytes = self.cipher_suite.decrypt(encrypted_bytes)
+            cipher_suite = self._cipher_suite_for_salt(encrypted_data.get('kdf_salt'))
+            decrypted_bytes = self._decrypt_token(encrypted_text, cipher_suite)
             original_message = decrypted_bytes.decode()
         except Exception as e:
             raise ValueError(f"Decryption failed: {e}")
@@ -468,8 +859,10 @@ class EmotionCipher:
         # Get emotions from signature
         detected_emotions = emotional_signature.get('primary_emotions', [])
         
-        # Also detect emotions from decrypted text for verification
-        verified_emotions = self.emotion_detector.get_primary_emotions(original_message)
+        # Optionally detect emotions from decrypted text for verification
+        verified_emotions = None
+        if verify:
+            verified_emotions = self.emotion_detector.get_primary_emotions(original_message)
         
         return {
             'original_message': original_message,
@@ -478,6 +871,23 @@ class EmotionCipher:
             'emotional_signature': emotional_signature
         }
     
+    def _cipher_suite_for_salt(self, kdf_salt: Optional[str]) -> Fernet:
+        """Return the cipher suite for a payload's key derivation salt."""
+        # Payloads from earlier versions carry no salt and used the fixed one
+        salt = base64.urlsafe_b64decode(kdf_salt) if kdf_salt else KDF_SALT
+        if salt == self.salt:
+            return self.cipher_suite
+        return self._create_cipher_suite(_derive_key_cached(self.password, salt, KDF_ITERATIONS))
+    
+    def _decrypt_token(self, encrypted_text: str, cipher_suite: Fernet) -> bytes:
+        """Decrypt a Fernet token, also accepting the legacy base64-wrapped format."""
+        token = encrypted_text.encode()
+        try:
+            return cipher_suite.decrypt(token)
+        except InvalidToken:
+            # Payloads from earlier versions base64-encoded the Fernet token a second time
+            return cipher_suite.decrypt(base64.urlsafe_b64decode(token))
+    
     def format_output(self, encrypted_data: Dict, use_short: bool = True) -> str:
         """Format encrypted output for display."""
         # Use short encrypted text for display if available, otherwise use full